@@ -469,7 +469,8 @@ class ReformerDecoder(FairseqIncrementalDecoder):
 
         # T x S x B x C -> T x B x C
         # TODO: output_layer after project_out_dim
-        x = self.output_layer(x, encoder_out['encoder_padding_mask'] if encoder_out is not None else None)
+        x = self.output_layer(x, encoder_out['encoder_padding_mask'] if encoder_out is not None else None,
+                              incremental_state)
 
         if self.normalize:
             x = self.layer_norm(x)
@@ -543,12 +544,12 @@ class ReformerOutputLayer(nn.Module):
         super().__init__()
         self.reduction = Reduction(args.decoder_output_layer, args.decoder_normalize_before, args)
 
-    def forward(self, x, encoder_padding_mask):
+    def forward(self, x, encoder_padding_mask, incremental_state=None):
         # since reduction happens after layer_norm, additional layer_norm might be required after the
         # reduction, especially for those reduction variants that does not preserve output scale
         if encoder_padding_mask is not None:
             encoder_padding_mask = encoder_padding_mask.to(x.device)
-        x = self.reduction(x, encoder_padding_mask)
+        x = self.reduction(x, encoder_padding_mask, incremental_state)
         return x
 
 
@@ -698,7 +698,9 @@ class TransformerDecoderLayer(nn.Module):
         x = self.maybe_layer_norm(self.final_layer_norm, x, after=True)
         if self.onnx_trace:
             saved_state = self.self_attn._get_input_buffer(incremental_state)
-            self_attn_state = saved_state["prev_key"], saved_state["prev_value"]
+            # the cache buffer is capacity-padded; export only the valid steps
+            prev_len = saved_state.get("prev_len", saved_state["prev_key"].size(0))
+            self_attn_state = saved_state["prev_key"][:prev_len], saved_state["prev_value"][:prev_len]
             return x, attn, self_attn_state
         return x, attn
 
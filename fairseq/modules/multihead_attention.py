@@ -82,6 +82,8 @@ class MultiheadAttention(nn.Module):
 
         if incremental_state is not None:
             saved_state = self._get_input_buffer(incremental_state)
+            if saved_state is None:
+                saved_state = {}
             if 'prev_key' in saved_state:
                 # previous time steps are cached - no need to recompute
                 # key and value if they are static
@@ -110,18 +112,22 @@ class MultiheadAttention(nn.Module):
 
         if saved_state is not None:
 
-            if 'prev_key' in saved_state:
-                if static_kv:
+            if static_kv:
+                if 'prev_key' in saved_state:
                     k = saved_state['prev_key']
-                else:
-                    k = torch.cat((saved_state['prev_key'], k), dim=0)
-            if 'prev_value' in saved_state:
-                if static_kv:
                     v = saved_state['prev_value']
                 else:
-                    v = torch.cat((saved_state['prev_value'], v), dim=0)
-            saved_state['prev_key'] = k
-            saved_state['prev_value'] = v
+                    saved_state['prev_key'] = k
+                    saved_state['prev_value'] = v
+            else:
+                # state injected from outside (prev_self_attn_state / ONNX)
+                # carries no length counter: every stored step is valid then
+                prev_len = saved_state.get(
+                    'prev_len', saved_state['prev_key'].size(0) if 'prev_key' in saved_state else 0)
+                new_len = prev_len + k.size(0)
+                k = self._append_step(saved_state, 'prev_key', prev_len, k)
+                v = self._append_step(saved_state, 'prev_value', prev_len, v)
+                saved_state['prev_len'] = new_len
 
             self._set_input_buffer(incremental_state, saved_state)
 
@@ -208,20 +214,50 @@ class MultiheadAttention(nn.Module):
             bias = bias[start:end]
         return F.linear(input, weight, bias)
 
+    def _append_step(self, saved_state, key, length, x):
+        """
+        Append ``x`` along the time dimension of the pre-allocated cache buffer
+        stored under ``key``, doubling the buffer capacity when it runs out.
+        Amortizes the cache update to O(1) copied steps instead of
+        re-concatenating the whole history (O(T^2) over a T-step decode).
+        :param saved_state: Dictionary, the cached state of this module
+        :param key: str
+        :param length: int, number of valid steps already in the buffer
+        :param x: torch.FloatTensor, Time x Batch x Channel
+        :return: torch.FloatTensor, view of the first ``length + x.size(0)`` steps
+        """
+        buffer = saved_state.get(key)
+        new_len = length + x.size(0)
+        if buffer is None or buffer.size(0) < new_len:
+            capacity = max(new_len, 2 * length)
+            new_buffer = x.new_zeros((capacity,) + tuple(x.size()[1:]))
+            if length > 0:
+                new_buffer[:length] = buffer[:length]
+            buffer = new_buffer
+        buffer[length:new_len] = x
+        saved_state[key] = buffer
+        return buffer[:new_len]
+
     def reorder_incremental_state(self, incremental_state, new_order):
         """Reorder buffered internal state (for incremental generation)."""
         input_buffer = self._get_input_buffer(incremental_state)
         if input_buffer is not None:
             for k in input_buffer.keys():
-                input_buffer[k] = input_buffer[k].index_select(1, new_order.to(input_buffer[k].device))
+                if torch.is_tensor(input_buffer[k]):
+                    input_buffer[k] = input_buffer[k].index_select(
+                        1, utils.get_device_resident_new_order(
+                            incremental_state, new_order, input_buffer[k].device))
             self._set_input_buffer(incremental_state, input_buffer)
 
     def _get_input_buffer(self, incremental_state):
+        # may return None: the initial dict is allocated by the caller that
+        # actually writes the cache, so per-step reorder calls on modules
+        # without cached state stay allocation-free
         return utils.get_incremental_state(
             self,
             incremental_state,
             'attn_state',
-        ) or {}
+        )
 
     def _set_input_buffer(self, incremental_state, buffer):
         utils.set_incremental_state(
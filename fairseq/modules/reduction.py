@@ -5,6 +5,8 @@
 # the root directory of this source tree. An additional grant of patent rights
 # can be found in the PATENTS file in the same directory.
 
+from typing import Optional
+
 import torch
 from torch import nn
 from torch.nn import Parameter
@@ -13,6 +15,35 @@ import torch.nn.functional as F
 _VALID_REDUCTION = {}
 
 
+@torch.jit.script
+def _masked_softmax_reduce(weights, x, mask: Optional[torch.Tensor]):
+    """
+    Softmax-weighted reduction of the source dimension, spelled out as an
+    explicit mask -> logsumexp -> exp -> weighted-sum chain so the whole
+    post-projection part forms one fusible block instead of five separate ops.
+    Inputs are batch-major so the softmax and weighted sum run over the rows
+    of a (T*B) x S x C layout rather than striding across the batch.
+    :param weights: torch.FloatTensor, T x B x S x C
+    :param x: torch.FloatTensor, T x B x S x C
+    :param mask: torch.ByteTensor, 1 x B x S x 1, masked elements indicated by 1, or None
+    :return: torch.FloatTensor, T x B x C
+    """
+    # FP16 support: exponentials and the accumulation over S run in fp32,
+    # only the reduced result is cast back to the input dtype
+    weights = weights.float()
+    if mask is not None:
+        # torch.where with a broadcast scalar fill writes the masked tensor
+        # directly instead of masked_fill's copy-then-fill pair, so only one
+        # full-size tensor is live alongside x and weights
+        weights = torch.where(mask, weights.new_full([1], float('-inf')), weights)
+    # log-normalize with a single fused reduction, then exponentiate:
+    # exp(w - logsumexp(w)) yields the probabilities directly, so neither the
+    # separate denominator pass nor the T x B x S x C probability tensor of a
+    # softmax-then-normalize formulation is materialized
+    weights = weights - torch.logsumexp(weights, dim=2, keepdim=True)
+    return torch.sum(weights.exp() * x.float(), dim=2).type_as(x)
+
+
 def register_to(name: str, mapping: dict):
     def wrapper(fn):
         mapping[name] = fn
@@ -32,6 +63,7 @@ class Reduction(nn.Module):
         self.method = method
         self.normalize_before = normalize_before
         self.specific_repr = None
+        self._mask_cache = None
         self.layer_norm = nn.LayerNorm(args.decoder_model_dim)
         self.customize_forward = self.VALID_REDUCTION[self.method](self, args)
 
@@ -43,6 +75,23 @@ class Reduction(nn.Module):
     def forward(self, *args, **kwargs):
         return self.customize_forward(*args, **kwargs)
 
+    def buffered_mask(self, mask, reshape, incremental_state=None):
+        """
+        Reshape the B x S padding mask so it broadcasts over the reducer input.
+        During incremental decoding the same mask is handed in on every step,
+        so the reshaped tensor is cached and only re-derived when the generator
+        supplies a different one (e.g. after a beam reorder).
+        :param mask: torch.ByteTensor, B x S, masked elements indicated by 1
+        :param reshape: Callable, turns the mask into its broadcast form
+        :param incremental_state: Dictionary
+        :return: torch.ByteTensor, broadcastable over the reducer input
+        """
+        if incremental_state is None:
+            return reshape(mask)
+        if self._mask_cache is None or self._mask_cache[0] is not mask:
+            self._mask_cache = (mask, reshape(mask))
+        return self._mask_cache[1]
+
     def maybe_layer_norm(self, layer_norm, x, before=False, after=False):
         assert before ^ after
         if after ^ self.normalize_before:
@@ -69,9 +118,11 @@ class Reduction(nn.Module):
             x = self.maybe_layer_norm(self.layer_norm, x, before=True)
             # T x S x B x C
             if mask is not None:
-                x = x.masked_fill(
-                    mask.transpose(0, 1).unsqueeze(0).unsqueeze(-1),
-                    float('-inf'),
+                x = torch.where(
+                    self.buffered_mask(mask, lambda m: m.transpose(0, 1).unsqueeze(0).unsqueeze(-1),
+                                       incremental_state),
+                    x.new_full((1,), float('-inf')),
+                    x,
                 )
             # T x B x C
             x = x.max(dim=1)[0]
@@ -89,6 +140,9 @@ class Reduction(nn.Module):
         :param args: Namespace
         :return: Callable
         """
+        # stored pre-transposed (input dim x output dim) so scoring needs no
+        # transposed GEMM operand; square and iid-initialized, so the init is
+        # unaffected by the orientation
         self.weights = Parameter(torch.Tensor(args.decoder_model_dim, args.decoder_model_dim))
         nn.init.normal_(self.weights, mean=0, std=args.decoder_model_dim ** -0.5)
 
@@ -101,16 +155,43 @@ class Reduction(nn.Module):
             :return: torch.FloatTensor, T x B x C
             """
             x = self.maybe_layer_norm(self.layer_norm, x, before=True)
-            # T x S x B x C
-            weights = F.linear(x, self.weights)
+            # T x S x B x C -> T x B x S x C
+            x = x.permute(0, 2, 1, 3).contiguous()
+            # score with one flat GEMM over the contiguous (T*B*S) x C view
+            weights = x.view(-1, x.size(-1)).mm(self.weights).view(x.size())
             if mask is not None:
-                mask = mask.transpose(0, 1).unsqueeze(0).unsqueeze(-1)
-                weights = weights.masked_fill(
-                    mask,
-                    float('-inf'),
-                )
-            prob = F.softmax(weights, dim=1)
-            x = torch.sum(prob * x, dim=1)
+                mask = self.buffered_mask(mask, lambda m: m.unsqueeze(0).unsqueeze(-1),
+                                          incremental_state)
+            x = _masked_softmax_reduce(weights, x, mask)
+            x = self.maybe_layer_norm(self.layer_norm, x, after=True)
+            return x
+
+        return _forward
+
+    @register_to('softmax', _VALID_REDUCTION)
+    def softmax(self, args):
+        """
+        Reduce the source dimension based on the distribution computed from the representation itself
+        (parameter-free counterpart of `attn`: the scores are the activations themselves).
+        :param args: Namespace
+        :return: Callable
+        """
+
+        def _forward(x, mask, incremental_state=None):
+            """
+            Customized forward function
+            :param x: torch.FloatTensor, T x S x B x C
+            :param mask: torch.ByteTensor, B x S, masked elements indicated by 1
+            :param incremental_state: Dictionary
+            :return: torch.FloatTensor, T x B x C
+            """
+            x = self.maybe_layer_norm(self.layer_norm, x, before=True)
+            # T x S x B x C -> T x B x S x C
+            x = x.permute(0, 2, 1, 3).contiguous()
+            if mask is not None:
+                mask = self.buffered_mask(mask, lambda m: m.unsqueeze(0).unsqueeze(-1),
+                                          incremental_state)
+            x = _masked_softmax_reduce(x, x, mask)
             x = self.maybe_layer_norm(self.layer_norm, x, after=True)
             return x
 
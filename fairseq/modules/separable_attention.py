@@ -103,6 +103,8 @@ class SeparableAttention(nn.Module):
         # encoder self-attention does not need cache
         if incremental_state is not None and self.tgt_attn:
             saved_state = self._get_input_buffer(incremental_state)
+            if saved_state is None:
+                saved_state = {}
         else:
             saved_state = None
 
@@ -123,12 +125,10 @@ class SeparableAttention(nn.Module):
 
         if saved_state is not None:
 
-            if 'prev_key' in saved_state:
-                k = torch.cat((saved_state['prev_key'], k), dim=0)
-            if 'prev_value' in saved_state:
-                v = torch.cat((saved_state['prev_value'], v), dim=0)
-            saved_state['prev_key'] = k
-            saved_state['prev_value'] = v
+            prev_len = saved_state.get('prev_len', 0)
+            new_len = prev_len + k.size(0)
+            k, v = self._append_kv(saved_state, prev_len, k, v)
+            saved_state['prev_len'] = new_len
 
             self._set_input_buffer(incremental_state, saved_state)
 
@@ -226,23 +226,57 @@ class SeparableAttention(nn.Module):
             bias = bias[start:end]
         return F.linear(input, weight, bias)
 
+    def _append_kv(self, saved_state, length, k, v):
+        """
+        Append the step's key/value pair along the time dimension of the single
+        stacked cache buffer, doubling its capacity when it runs out. The cache
+        is laid out struct-of-arrays style -- one 2 x Time x Source x Batch x
+        Channel tensor instead of a dict of two -- so a step writes both halves
+        of one allocation and beam reordering touches one tensor. Appends cost
+        amortized O(1) copied steps instead of re-concatenating the whole
+        history (O(T^2) over a T-step decode).
+        :param saved_state: Dictionary, the cached state of this module
+        :param length: int, number of valid steps already in the buffer
+        :param k: torch.FloatTensor, Time x Source x Batch x Channel
+        :param v: torch.FloatTensor, Time x Source x Batch x Channel
+        :return: tuple of torch.FloatTensor, views of the first ``length + k.size(0)`` steps
+        """
+        buffer = saved_state.get('prev_kv')
+        new_len = length + k.size(0)
+        if buffer is None or buffer.size(1) < new_len:
+            capacity = max(new_len, 2 * length)
+            new_buffer = k.new_zeros((2, capacity) + tuple(k.size()[1:]))
+            if length > 0:
+                new_buffer[:, :length] = buffer[:, :length]
+            buffer = new_buffer
+        buffer[0, length:new_len] = k
+        buffer[1, length:new_len] = v
+        saved_state['prev_kv'] = buffer
+        return buffer[0, :new_len], buffer[1, :new_len]
+
     def reorder_incremental_state(self, incremental_state, new_order):
         """Reorder buffered internal state (for incremental generation)."""
-        # Although encoder self-attention does not need cache, it still
-        # possesses an empty slot due to the calling of this function
+        # encoder self-attention keeps no cache, so for those modules the
+        # lookup returns None and the reorder falls through without work
         input_buffer = self._get_input_buffer(incremental_state)
         if input_buffer is not None:
             for k in input_buffer.keys():
-                # 2 is the Batch dim
-                input_buffer[k] = input_buffer[k].index_select(2, new_order.to(input_buffer[k].device))
+                if torch.is_tensor(input_buffer[k]):
+                    # 3 is the Batch dim (behind the kv and time dims)
+                    input_buffer[k] = input_buffer[k].index_select(
+                        3, utils.get_device_resident_new_order(
+                            incremental_state, new_order, input_buffer[k].device))
             self._set_input_buffer(incremental_state, input_buffer)
 
     def _get_input_buffer(self, incremental_state):
+        # may return None: the initial dict is allocated by the caller that
+        # actually writes the cache, so per-step reorder calls on modules
+        # without cached state stay allocation-free
         return utils.get_incremental_state(
             self,
             incremental_state,
             'attn_state',
-        ) or {}
+        )
 
     def _set_input_buffer(self, incremental_state, buffer):
         utils.set_incremental_state(
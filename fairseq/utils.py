@@ -220,6 +220,24 @@ def set_incremental_state(module, incremental_state, key, value):
         incremental_state[full_key] = value
 
 
+def get_device_resident_new_order(incremental_state, new_order, device):
+    """Helper for moving the beam reorder index to ``device`` at most once per
+    reordering pass. Every module is handed the same ``new_order`` tensor, so
+    the converted copies are cached in the shared ``incremental_state`` and
+    reused until the generator supplies a new order."""
+    if incremental_state is None or new_order.device == device:
+        return new_order
+    cached = incremental_state.get('new_order_cache')
+    if cached is None or cached[0] is not new_order:
+        cached = (new_order, {})
+        incremental_state['new_order_cache'] = cached
+    converted = cached[1].get(device)
+    if converted is None:
+        converted = new_order.to(device)
+        cached[1][device] = converted
+    return converted
+
+
 def load_align_dict(replace_unk):
     if replace_unk is None:
         align_dict = None
@@ -0,0 +1,86 @@
+import argparse
+import unittest
+import torch
+import torch.nn.functional as F
+
+from fairseq.modules.reduction import Reduction
+
+
+class TestReduction(unittest.TestCase):
+
+    def setUp(self):
+        # fix random seed since `attn` contains randomly initialized parameters
+        torch.manual_seed(0)
+        self.args = argparse.Namespace(decoder_model_dim=8)
+        # Time x Source x Batch x Channel
+        # 3 x 5 x 2 x 8
+        self.x = torch.randn(3, 5, 2, 8)
+        # Batch x Source
+        # 2 x 5
+        self.mask = torch.Tensor(
+            [[0, 0, 0, 0, 0],
+             [0, 0, 0, 1, 1]]
+        ).byte()
+
+    def _build(self, method):
+        reduction = Reduction(method, normalize_before=True, args=self.args)
+        # drop the layer norm so results can be checked against the plain formulas
+        reduction.layer_norm = torch.nn.Identity()
+        return reduction.eval()
+
+    def _reference(self, weights, mask):
+        # brute-force masked softmax over the source dimension
+        if mask is not None:
+            weights = weights.masked_fill(
+                mask.transpose(0, 1).unsqueeze(0).unsqueeze(-1),
+                float('-inf'),
+            )
+        prob = F.softmax(weights, dim=1)
+        return torch.sum(prob * self.x, dim=1)
+
+    def test_max(self):
+        print(f"{self.test_max.__name__} is testing......")
+        reduction = self._build('max')
+        for mask in (None, self.mask):
+            res = reduction(self.x, mask)
+            self.assertEqual(list(res.size()), [3, 2, 8])
+            masked = self.x if mask is None else self.x.masked_fill(
+                mask.transpose(0, 1).unsqueeze(0).unsqueeze(-1),
+                float('-inf'),
+            )
+            ans = masked.max(dim=1)[0]
+            self.assertTrue(torch.all(torch.le(torch.abs(res - ans), 1e-4)),
+                            msg=f"max reduction mismatch (mask={mask is not None})")
+
+    def test_attn(self):
+        print(f"{self.test_attn.__name__} is testing......")
+        reduction = self._build('attn')
+        for mask in (None, self.mask):
+            res = reduction(self.x, mask)
+            self.assertEqual(list(res.size()), [3, 2, 8])
+            ans = self._reference(self.x.matmul(reduction.weights), mask)
+            self.assertTrue(torch.all(torch.le(torch.abs(res - ans), 1e-4)),
+                            msg=f"attn reduction mismatch (mask={mask is not None})")
+
+    def test_softmax(self):
+        print(f"{self.test_softmax.__name__} is testing......")
+        reduction = self._build('softmax')
+        for mask in (None, self.mask):
+            res = reduction(self.x, mask)
+            self.assertEqual(list(res.size()), [3, 2, 8])
+            ans = self._reference(self.x, mask)
+            self.assertTrue(torch.all(torch.le(torch.abs(res - ans), 1e-4)),
+                            msg=f"softmax reduction mismatch (mask={mask is not None})")
+
+    def test_backward(self):
+        print(f"{self.test_backward.__name__} is testing......")
+        for method in Reduction.VALID_REDUCTION.keys():
+            reduction = self._build(method)
+            x = self.x.clone().requires_grad_(True)
+            reduction(x, self.mask).sum().backward()
+            self.assertTrue(torch.all(torch.eq(x.grad, x.grad)),
+                            msg=f"{method} reduction produced NaN gradients")
+
+
+if __name__ == "__main__":
+    unittest.main()